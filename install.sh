@@ -5,23 +5,50 @@ set -euo pipefail
 # Installs the .claude/ framework and CLAUDE.md.template into a target project.
 #
 # Usage:
-#   ./install.sh [--force] [TARGET_DIR]
+#   ./install.sh [--force] [--check] [TARGET_DIR]
 #
 # Options:
-#   --force    Overwrite existing .claude/ directory without prompting
+#   --force    Overwrite locally modified framework files
+#   --check    Dry run: report what would change without writing anything
+#              (exits 1 if an upgrade is pending, 0 otherwise; local edits to
+#              files unchanged upstream don't count)
 #
 # If TARGET_DIR is omitted, installs into the current directory.
 # Can also be run via curl:
-#   curl -fsSL https://raw.githubusercontent.com/alexperry0/claude-workflow/main/install.sh | bash -s -- [--force] [TARGET_DIR]
+#   curl -fsSL https://raw.githubusercontent.com/alexperry0/claude-workflow/main/install.sh | bash -s -- [--force] [--check] [TARGET_DIR]
+#
+# Installs are incremental. Every installed framework file is recorded with its
+# SHA-256 in .claude/.workflow-manifest, so re-running only copies files that
+# changed upstream, keeps files you modified locally, and removes files that
+# were dropped upstream (unless you modified them). When a file changed both
+# locally and upstream, it is skipped and the upstream version is saved next
+# to it as <file>.upstream. CLAUDE.md.template is a reference copy and is
+# always refreshed. On projects installed before the manifest existed, files
+# that differ from upstream are overwritten only after confirmation (or with
+# --force); otherwise they are kept and treated as local modifications.
+#
+# When run via curl, the framework is fetched as a single tarball and cached in
+# $CLAUDE_WORKFLOW_CACHE (default: ~/.cache/claude-workflow), keyed by commit.
+# --check downloads to a temporary directory and never writes to the cache.
+# Set CLAUDE_WORKFLOW_REF to install a branch or tag other than main.
+
+REPO_SLUG="alexperry0/claude-workflow"
+REPO_URL="https://github.com/$REPO_SLUG.git"
+REPO_REF="${CLAUDE_WORKFLOW_REF:-main}"
+CACHE_DIR="${CLAUDE_WORKFLOW_CACHE:-${XDG_CACHE_HOME:-$HOME/.cache}/claude-workflow}"
+MANIFEST=".claude/.workflow-manifest"
 
-REPO_URL="https://github.com/alexperry0/claude-workflow.git"
+# Directories to install from .claude/ (explicit list avoids copying settings.local.json)
+SUBDIRS="agents commands guides hooks personas templates"
 
 # Parse arguments
 FORCE=false
+CHECK=false
 TARGET_DIR="."
 for arg in "$@"; do
     case "$arg" in
         --force) FORCE=true ;;
+        --check) CHECK=true ;;
         *) TARGET_DIR="$arg" ;;
     esac
 done
@@ -33,85 +60,406 @@ if [ ! -d "$TARGET_DIR" ]; then
 fi
 TARGET_DIR="$(cd "$TARGET_DIR" && pwd)"
 
-# Determine script location or use temp clone
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]:-$0}")" && pwd)"
-
-if [ -d "$SCRIPT_DIR/.claude" ] && [ -f "$SCRIPT_DIR/CLAUDE.md.template" ]; then
-    SOURCE_DIR="$SCRIPT_DIR"
-    CLEANUP=false
+if command -v sha256sum &>/dev/null; then
+    HASH_CMD="sha256sum"
+elif command -v shasum &>/dev/null; then
+    HASH_CMD="shasum -a 256"
 else
-    CLONE_DIR="$(mktemp -d)"
-    echo "Cloning claude-workflow..."
-    git clone --depth 1 --quiet "$REPO_URL" "$CLONE_DIR/claude-workflow"
-    SOURCE_DIR="$CLONE_DIR/claude-workflow"
-    CLEANUP=true
+    echo "Error: sha256sum or shasum is required."
+    exit 1
 fi
 
+WORK_DIR="$(mktemp -d)"
 cleanup() {
-    [ "$CLEANUP" = true ] && rm -rf "$CLONE_DIR"
+    rm -rf "$WORK_DIR"
+}
+trap cleanup EXIT
+
+# Cache entries are named by full commit SHA; nothing else in CACHE_DIR is touched
+SHA_PATTERN="$(printf '[0-9a-f]%.0s' $(seq 40))"
+
+# Resolve REPO_REF to a commit SHA (empty if offline)
+resolve_ref() {
+    local sha=""
+    sha="$(curl -fsSL -H "Accept: application/vnd.github.sha" \
+        "https://api.github.com/repos/$REPO_SLUG/commits/$REPO_REF" 2>/dev/null)" || sha=""
+    if [ -z "$sha" ] && command -v git &>/dev/null; then
+        # Ask for exact refs: a branch, else the commit an annotated or lightweight tag points to
+        sha="$(git ls-remote "$REPO_URL" "refs/heads/$REPO_REF" "refs/tags/$REPO_REF^{}" \
+            "refs/tags/$REPO_REF" 2>/dev/null | awk -v ref="$REPO_REF" '
+                $2 == "refs/heads/" ref       { found[1] = $1 }
+                $2 == "refs/tags/" ref "^{}"  { found[2] = $1 }
+                $2 == "refs/tags/" ref        { found[3] = $1 }
+                END { for (i = 1; i <= 3; i++) if (i in found) { print found[i]; exit } }
+            ')" || sha=""
+    fi
+    case "$sha" in
+        $SHA_PATTERN) echo "$sha" ;;
+        *) echo "" ;;
+    esac
+}
+
+# True if $1 looks like a complete framework checkout
+is_source_dir() {
+    [ -d "$1/.claude" ] && [ -f "$1/CLAUDE.md.template" ]
 }
 
-# Warn if .claude/ already exists
-if [ -d "$TARGET_DIR/.claude" ]; then
-    if [ "$FORCE" = true ]; then
-        echo "WARNING: Overwriting $TARGET_DIR/.claude/ (--force specified)"
-    elif [ -t 0 ]; then
-        echo "WARNING: $TARGET_DIR/.claude/ already exists."
-        echo "  Re-running will overwrite customized commands, hooks, agents, etc."
-        read -p "  Continue? [y/N] " confirm
-        if [[ ! "$confirm" =~ ^[Yy]$ ]]; then
-            echo "Aborted."
-            cleanup
-            exit 1
+# Fetch the framework tarball and print the source directory.
+# Runs inside $(...), where set -e does not apply: every step is checked explicitly.
+# In --check mode the download goes to WORK_DIR and the cache is left untouched.
+fetch_source() {
+    local sha cached dest
+    sha="$(resolve_ref)"
+
+    if [ -z "$sha" ]; then
+        cached="$(cd "$CACHE_DIR" 2>/dev/null && ls -1td $SHA_PATTERN 2>/dev/null | head -n 1)"
+        if [ -n "$cached" ] && is_source_dir "$CACHE_DIR/$cached"; then
+            echo "WARNING: Could not resolve '$REPO_REF'; using cached copy ${cached:0:7}." >&2
+            echo "$CACHE_DIR/$cached"
+            return 0
         fi
+        echo "Error: Could not resolve '$REPO_REF' and no cached copy is available." >&2
+        return 1
+    fi
+
+    if is_source_dir "$CACHE_DIR/$sha"; then
+        # Mark as in use so concurrent installs don't prune it
+        [ "$CHECK" = false ] && touch "$CACHE_DIR/$sha"
+        echo "$CACHE_DIR/$sha"
+        return 0
+    fi
+
+    # Extract under a unique name next to the final location so the rename is atomic
+    if [ "$CHECK" = true ]; then
+        dest="$WORK_DIR/download"
+        mkdir -p "$dest" || return 1
     else
-        echo "ERROR: $TARGET_DIR/.claude/ already exists."
-        echo "  Cannot prompt for confirmation in piped mode."
-        echo "  Pass --force to overwrite: bash -s -- --force [TARGET_DIR]"
-        cleanup
-        exit 1
+        mkdir -p "$CACHE_DIR" || return 1
+        dest="$(mktemp -d "$CACHE_DIR/.download.XXXXXX")" || return 1
+    fi
+
+    echo "Downloading claude-workflow ($REPO_REF @ ${sha:0:7})..." >&2
+    if ! curl -fsSL "https://codeload.github.com/$REPO_SLUG/tar.gz/$sha" \
+        | tar -xzf - --strip-components=1 -C "$dest"; then
+        echo "Error: Failed to download claude-workflow ($REPO_REF @ ${sha:0:7})." >&2
+        rm -rf "$dest"
+        return 1
     fi
+    if ! is_source_dir "$dest"; then
+        echo "Error: Downloaded archive is incomplete (missing .claude/ or CLAUDE.md.template)." >&2
+        rm -rf "$dest"
+        return 1
+    fi
+
+    if [ "$CHECK" = true ]; then
+        echo "$dest"
+        return 0
+    fi
+
+    if [ -d "$CACHE_DIR/$sha" ]; then
+        # Another install cached this commit first
+        rm -rf "$dest"
+    elif ! mv "$dest" "$CACHE_DIR/$sha"; then
+        echo "Error: Could not save download to $CACHE_DIR/$sha." >&2
+        rm -rf "$dest"
+        return 1
+    fi
+    # Lost a rename race: mv nested the download inside the winner's copy
+    rm -rf "$CACHE_DIR/$sha/$(basename "$dest")"
+
+    # Prune other commits and abandoned downloads not used in the last hour
+    find "$CACHE_DIR" -mindepth 1 -maxdepth 1 -type d \
+        \( -name "$SHA_PATTERN" -o -name '.download.*' \) ! -name "$sha" -mmin +60 \
+        -exec rm -rf {} + 2>/dev/null || true
+
+    echo "$CACHE_DIR/$sha"
+}
+
+# Determine script location or fetch a copy. Piped via curl there is no script
+# file, and $0 is just "bash", so never guess a source from the current directory.
+SCRIPT_DIR=""
+if [ -n "${BASH_SOURCE[0]:-}" ] && [ -f "${BASH_SOURCE[0]}" ]; then
+    SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 fi
 
-echo "Installing claude-workflow into: $TARGET_DIR"
+if [ -n "$SCRIPT_DIR" ] && is_source_dir "$SCRIPT_DIR"; then
+    SOURCE_DIR="$SCRIPT_DIR"
+elif command -v curl &>/dev/null && command -v tar &>/dev/null; then
+    SOURCE_DIR="$(fetch_source)" || exit 1
+else
+    echo "Cloning claude-workflow..."
+    git clone --depth 1 --quiet --branch "$REPO_REF" "$REPO_URL" "$WORK_DIR/claude-workflow"
+    SOURCE_DIR="$WORK_DIR/claude-workflow"
+fi
 
-# Directories to copy from .claude/ (explicit list avoids copying settings.local.json)
-SUBDIRS="agents commands guides hooks personas templates"
+# Installing a directory onto itself would record local edits as the upstream
+# baseline, so later upgrades would overwrite or delete customized files.
+if [ "$(cd "$SOURCE_DIR" && pwd -P)" = "$(cd "$TARGET_DIR" && pwd -P)" ]; then
+    echo "Error: Source and target are the same directory ($TARGET_DIR)."
+    echo "  Run install.sh from a separate clone, or via curl, with the project as TARGET_DIR."
+    exit 1
+fi
+
+# Diff hints can only point at SOURCE_DIR if it outlives this run
+case "$SOURCE_DIR" in
+    "$WORK_DIR"/*) SOURCE_PERSISTS=false ;;
+    *) SOURCE_PERSISTS=true ;;
+esac
+
+# Print "<sha256>  <path>" for each listed file that exists under $1
+# (file list on stdin, paths relative to $1)
+hash_files() {
+    local root="$1"
+    (cd "$root" && while IFS= read -r f; do
+        if [ -f "$f" ]; then printf '%s\0' "$f"; fi
+    done | xargs -0 -r $HASH_CMD) | LC_ALL=C sort -k 2
+}
+
+# List framework files in the source tree
+list_source_files() {
+    (cd "$SOURCE_DIR" && {
+        for dir in $SUBDIRS; do
+            if [ -d ".claude/$dir" ]; then
+                find ".claude/$dir" -type f ! -path '*/__pycache__/*' ! -name '*.pyc'
+            fi
+        done
+        echo "CLAUDE.md.template"
+    }) | LC_ALL=C sort
+}
 
-mkdir -p "$TARGET_DIR/.claude"
-for dir in $SUBDIRS; do
-    if [ -d "$SOURCE_DIR/.claude/$dir" ]; then
-        if command -v rsync &>/dev/null; then
-            rsync -a --exclude='__pycache__' "$SOURCE_DIR/.claude/$dir/" "$TARGET_DIR/.claude/$dir/"
-        else
-            cp -r "$SOURCE_DIR/.claude/$dir" "$TARGET_DIR/.claude/$dir"
-            find "$TARGET_DIR/.claude/$dir" -type d -name '__pycache__' -prune -exec rm -rf {} + 2>/dev/null || true
+SRC_MANIFEST="$WORK_DIR/source.manifest"
+OLD_MANIFEST="$WORK_DIR/installed.manifest"
+CUR_MANIFEST="$WORK_DIR/current.manifest"
+NEW_MANIFEST="$WORK_DIR/new.manifest"
+
+list_source_files | hash_files "$SOURCE_DIR" > "$SRC_MANIFEST"
+if ! grep -q '  \.claude/' "$SRC_MANIFEST"; then
+    echo "Error: No framework files found in $SOURCE_DIR; refusing to continue."
+    exit 1
+fi
+
+HAVE_MANIFEST=false
+if [ -f "$TARGET_DIR/$MANIFEST" ]; then
+    HAVE_MANIFEST=true
+    cp "$TARGET_DIR/$MANIFEST" "$OLD_MANIFEST"
+else
+    : > "$OLD_MANIFEST"
+fi
+cut -c 67- "$SRC_MANIFEST" "$OLD_MANIFEST" | LC_ALL=C sort -u \
+    | hash_files "$TARGET_DIR" > "$CUR_MANIFEST"
+
+# Build the install plan: one "<action>\t<source hash>\t<installed hash>\t<path>" per file.
+#   add       - missing in target
+#   same      - target already matches source
+#   update    - changed upstream, unmodified locally (CLAUDE.md.template is always updated)
+#   modified  - changed locally, unchanged upstream (kept silently)
+#   conflict  - changed both locally and upstream
+#   unknown   - target differs from source and was never recorded in the manifest
+#               (installed before manifests existed, or created by hand)
+#   remove    - dropped upstream, unmodified locally
+#   orphan    - dropped upstream, modified locally (left in place)
+plan() {
+    awk -v old_file="$OLD_MANIFEST" -v cur_file="$CUR_MANIFEST" '
+        BEGIN {
+            while ((getline line < old_file) > 0) old[substr(line, 67)] = substr(line, 1, 64)
+            while ((getline line < cur_file) > 0) cur[substr(line, 67)] = substr(line, 1, 64)
+        }
+        {
+            path = substr($0, 67); src = substr($0, 1, 64); seen[path] = 1
+            o = (path in old) ? old[path] : "-"
+            if (!(path in cur))                   action = "add"
+            else if (cur[path] == src)            action = "same"
+            else if (path == "CLAUDE.md.template") action = "update"
+            else if (cur[path] == o)              action = "update"
+            else if (o == "-")                    action = "unknown"
+            else if (src == o)                    action = "modified"
+            else                                  action = "conflict"
+            printf "%s\t%s\t%s\t%s\n", action, src, o, path
+        }
+        END {
+            for (path in old) {
+                if (path in seen || !(path in cur)) continue
+                action = (cur[path] == old[path]) ? "remove" : "orphan"
+                printf "%s\t-\t%s\t%s\n", action, old[path], path
+            }
+        }
+    ' "$SRC_MANIFEST" | LC_ALL=C sort -t "$(printf '\t')" -k 4
+}
+
+PLAN="$WORK_DIR/plan"
+plan > "$PLAN"
+UNKNOWN=$(grep -c '^unknown' "$PLAN" || true)
+
+if [ "$CHECK" = true ]; then
+    echo "Checking claude-workflow install in: $TARGET_DIR"
+else
+    echo "Installing claude-workflow into: $TARGET_DIR"
+fi
+
+# Files with no install record can't be told apart from local customizations.
+# Ask once before overwriting them (the old installer's behavior), or require --force.
+ADOPT=$FORCE
+if [ "$UNKNOWN" -gt 0 ] && [ "$FORCE" = false ] && [ "$CHECK" = false ]; then
+    if [ "$HAVE_MANIFEST" = false ]; then
+        echo "No install record found in $TARGET_DIR/.claude/ (installed by an older installer?)."
+    fi
+    echo "  $UNKNOWN file(s) differ from upstream with no recorded baseline."
+    if [ -t 0 ]; then
+        echo "  Overwriting them replaces any customizations you made."
+        read -p "  Overwrite them with the upstream versions? [y/N] " confirm
+        if [[ "$confirm" =~ ^[Yy]$ ]]; then
+            ADOPT=true
         fi
     fi
-done
+fi
+
+ADDED=0
+UPDATED=0
+REMOVED=0
+SKIPPED=0
+SKIPPED_UNKNOWN=0
+CREATED=0
+: > "$NEW_MANIFEST"
+
+# Print a skip line for $2 with reason $1. Outside --check, the upstream version is
+# saved as <file>.upstream so the diff hint still works after the temp source is gone.
+skip_file() {
+    local reason="$1" path="$2" upstream
+    if [ "$CHECK" = false ]; then
+        cp "$SOURCE_DIR/$path" "$TARGET_DIR/$path.upstream"
+        upstream="$TARGET_DIR/$path.upstream"
+    elif [ "$SOURCE_PERSISTS" = true ]; then
+        upstream="$SOURCE_DIR/$path"
+    else
+        echo "  skip     $path ($reason)"
+        return
+    fi
+    echo "  skip     $path ($reason; diff -u \"$TARGET_DIR/$path\" \"$upstream\")"
+}
+
+while IFS="$(printf '\t')" read -r action src old path; do
+    case "$action" in
+        same)
+            echo "$src  $path" >> "$NEW_MANIFEST"
+            if [ "$CHECK" = false ] && [ -e "$TARGET_DIR/$path.upstream" ]; then
+                rm -f "$TARGET_DIR/$path.upstream"
+            fi
+            continue
+            ;;
+        modified)
+            if [ "$FORCE" = false ]; then
+                [ "$CHECK" = true ] && echo "  keep     $path (locally modified, unchanged upstream)"
+                echo "$old  $path" >> "$NEW_MANIFEST"
+                continue
+            fi
+            ;;
+        conflict)
+            if [ "$FORCE" = false ]; then
+                skip_file "locally modified, changed upstream" "$path"
+                echo "$old  $path" >> "$NEW_MANIFEST"
+                SKIPPED=$((SKIPPED + 1))
+                continue
+            fi
+            ;;
+        unknown)
+            if [ "$ADOPT" = false ]; then
+                skip_file "unknown baseline" "$path"
+                # Treat the kept file as a local modification of the current upstream from now on
+                echo "$src  $path" >> "$NEW_MANIFEST"
+                SKIPPED=$((SKIPPED + 1))
+                SKIPPED_UNKNOWN=$((SKIPPED_UNKNOWN + 1))
+                continue
+            fi
+            ;;
+        orphan)
+            echo "  keep     $path (removed upstream, locally modified)"
+            SKIPPED=$((SKIPPED + 1))
+            continue
+            ;;
+        remove)
+            echo "  remove   $path"
+            [ "$CHECK" = false ] && rm -f "$TARGET_DIR/$path"
+            REMOVED=$((REMOVED + 1))
+            continue
+            ;;
+    esac
+
+    # add, update, or overwritten modified/conflict/unknown
+    case "$action" in
+        add) echo "  add      $path"; ADDED=$((ADDED + 1)) ;;
+        *) echo "  update   $path"; UPDATED=$((UPDATED + 1)) ;;
+    esac
+    if [ "$CHECK" = false ]; then
+        mkdir -p "$(dirname "$TARGET_DIR/$path")"
+        cp "$SOURCE_DIR/$path" "$TARGET_DIR/$path"
+        rm -f "$TARGET_DIR/$path.upstream"
+    fi
+    echo "$src  $path" >> "$NEW_MANIFEST"
+done < "$PLAN"
 
 # Install settings.local.json only if one doesn't already exist
 if [ ! -f "$TARGET_DIR/.claude/settings.local.json" ]; then
-    cp "$SOURCE_DIR/.claude/settings.local.json.template" "$TARGET_DIR/.claude/settings.local.json"
-    echo "Created .claude/settings.local.json from template (review and adjust permissions)."
+    CREATED=$((CREATED + 1))
+    if [ "$CHECK" = true ]; then
+        echo "  create   .claude/settings.local.json (from template)"
+    else
+        cp "$SOURCE_DIR/.claude/settings.local.json.template" "$TARGET_DIR/.claude/settings.local.json"
+        echo "Created .claude/settings.local.json from template (review and adjust permissions)."
+    fi
 fi
 
-# Copy CLAUDE.md.template
-cp "$SOURCE_DIR/CLAUDE.md.template" "$TARGET_DIR/CLAUDE.md.template"
-
 # If no CLAUDE.md exists, copy the template as a starting point
 if [ ! -f "$TARGET_DIR/CLAUDE.md" ]; then
-    cp "$SOURCE_DIR/CLAUDE.md.template" "$TARGET_DIR/CLAUDE.md"
-    echo "Created CLAUDE.md from template (fill in your project details)."
+    CREATED=$((CREATED + 1))
+    if [ "$CHECK" = true ]; then
+        echo "  create   CLAUDE.md (from template)"
+    else
+        cp "$SOURCE_DIR/CLAUDE.md.template" "$TARGET_DIR/CLAUDE.md"
+        echo "Created CLAUDE.md from template (fill in your project details)."
+    fi
 fi
 
-# Cleanup temp clone if needed
-cleanup
+SUMMARY="$ADDED added, $UPDATED updated, $REMOVED removed, $CREATED created, $SKIPPED skipped"
+CHANGES=$((ADDED + UPDATED + REMOVED + CREATED))
+
+if [ "$CHECK" = true ]; then
+    echo ""
+    echo "Dry run: $SUMMARY (no files written)."
+    if [ "$SKIPPED" -gt 0 ]; then
+        echo "Re-run with --force to overwrite locally modified files."
+    fi
+    # Non-zero when an upgrade is pending; files only modified locally don't count
+    [ $((CHANGES + SKIPPED)) -eq 0 ] && exit 0
+    exit 1
+fi
+
+if ! cmp -s "$NEW_MANIFEST" "$OLD_MANIFEST" || [ "$HAVE_MANIFEST" = false ]; then
+    mkdir -p "$TARGET_DIR/.claude"
+    mv "$NEW_MANIFEST" "$TARGET_DIR/$MANIFEST"
+fi
+
+# Files with an unknown baseline may just be outdated, so never report those as up to date
+if [ "$CHANGES" -eq 0 ] && [ "$SKIPPED_UNKNOWN" -eq 0 ]; then
+    if [ "$SKIPPED" -gt 0 ]; then
+        echo "Already up to date ($SKIPPED file(s) changed both locally and upstream left untouched; --force to overwrite)."
+    else
+        echo "Already up to date."
+    fi
+    exit 0
+fi
 
 echo ""
-echo "Done! Installed:"
+echo "Done! $SUMMARY."
 echo "  .claude/            — agents, commands, hooks, guides, personas, templates"
 echo "  CLAUDE.md.template  — reference template"
+if [ "$SKIPPED_UNKNOWN" -gt 0 ]; then
+    echo ""
+    echo "$SKIPPED_UNKNOWN file(s) with no install record may be outdated and were kept as local"
+    echo "modifications. Review the diffs above, or re-run with --force to replace them with upstream."
+elif [ "$SKIPPED" -gt 0 ]; then
+    echo ""
+    echo "Locally modified files were left untouched. Re-run with --force to overwrite them."
+fi
 echo ""
 echo "Next steps:"
 echo "  1. Edit CLAUDE.md with your project's repo info, build commands, and architecture"